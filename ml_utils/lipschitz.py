@@ -1,45 +1,187 @@
 from typing import Optional, Dict
 
+import GPy
 import numpy as np
 from scipy import optimize as spo
 
 from ml_utils.models import GP
 from ml_utils.optimization import minimize_with_restarts
 
+try:
+    import numba
+except ImportError:  # numba is optional; fall back to the GPy path
+    numba = None
+
+
+def _rbf_grad_mu(x, X, alpha, inv_l2, kern_var):
+    """dmu/dx of an RBF-kernel GP posterior mean at a single point x.
+
+    Tight-loop version over precomputed GP data (training inputs,
+    alpha = K^-1 y summed over outputs, inverse squared lengthscales)
+    that numba can compile, bypassing the GPy dispatch chain inside the
+    optimisation hot loop.
+    """
+    n, d = X.shape
+    g = np.zeros(d)
+    for i in range(n):
+        r2 = 0.
+        for j in range(d):
+            diff = x[j] - X[i, j]
+            r2 += diff * diff * inv_l2[j]
+        w = alpha[i] * kern_var * np.exp(-0.5 * r2)
+        for j in range(d):
+            g[j] += w * (X[i, j] - x[j]) * inv_l2[j]
+    return g
+
+
+if numba is not None:
+    _rbf_grad_mu = numba.njit(cache=True, fastmath=True)(_rbf_grad_mu)
+
+
+class _NegativeGradNorm:
+    """Negative norm of the expected gradient of the surrogate's posterior.
+
+    A callable object rather than a closure so that it can be pickled
+    and shipped to the process-pool workers of minimize_with_restarts().
+
+    With use_jac=True, calls return (-||g||, -(H g)/||g||) with
+    g = dmu_dx(x) and H = d2mu_dx2(x), which saves
+    scipy.optimize.minimize from finite-differencing the gradient at
+    D+1 dmu_dx calls per line-search step. This requires the RBF
+    closed-form Hessian (see GP.d2mu_dx2); other kernels use
+    use_jac=False and return only the scalar.
+
+    The most recent evaluation is memoized on the bit-identical input,
+    so asking for the value and the gradient at the same x (or
+    re-evaluating an optimum) costs a single dmu_dx call.
+    """
+
+    def __init__(self, surrogate: GP, use_jac: bool = False) -> None:
+        self.surrogate = surrogate
+        self.use_jac = use_jac
+        self._last_key = None
+        self._last_result = None
+
+        # With numba available and a plain RBF kernel, evaluate dmu_dx
+        # with the compiled kernel over snapshots of the GP internals
+        # instead of going through the GPy dispatch chain
+        self._use_numba = (numba is not None
+                           and type(surrogate.kern) is GPy.kern.RBF)
+        if self._use_numba:
+            self._Xtr = np.ascontiguousarray(surrogate.X)
+            self._alpha = np.ascontiguousarray(surrogate.alpha.sum(-1))
+            self._inv_l2 = np.ascontiguousarray(np.broadcast_to(
+                1. / np.square(surrogate.kern.lengthscale),
+                (surrogate.X.shape[1],)))
+            self._kern_var = float(surrogate.kern.variance)
+
+    def _dmu_dx(self, x: np.ndarray) -> np.ndarray:
+        """Gradient of the posterior mean at the (2D, single-row) x,
+        summed over output dimensions"""
+        if self._use_numba:
+            return _rbf_grad_mu(x.ravel(), self._Xtr, self._alpha,
+                                self._inv_l2, self._kern_var)[None, :]
+        return self.surrogate.dmu_dx(x).sum(-1)
+
+    def _compute(self, x: np.ndarray) -> tuple:
+        key = x.tobytes()
+        if key != self._last_key:
+            x = np.atleast_2d(x)
+            g = self._dmu_dx(x)
+            # simply take the norm of the expectation of the gradient
+            res = np.linalg.norm(g, axis=1).item()
+
+            if not self.use_jac:
+                grad = None
+            elif res < 1e-12:  # gradient of the norm undefined at g = 0
+                grad = np.zeros(x.shape[1])
+            else:
+                hess = self.surrogate.d2mu_dx2(x)
+                grad = -np.einsum('mde,me->md', hess, g).ravel() / res
+
+            self._last_key = key
+            self._last_result = (-res, grad)
+        return self._last_result
+
+    def __call__(self, x: np.ndarray):
+        x = np.asarray(x, dtype=float)
+        if self.use_jac:
+            return self._compute(x)
+        return self._compute(x)[0]
+
+    def value(self, x: np.ndarray) -> float:
+        """Scalar objective only (for optimisers that want fun and jac
+        as separate callables, e.g. shgo's sampling phase)"""
+        return self._compute(np.asarray(x, dtype=float))[0]
+
+    def grad(self, x: np.ndarray) -> np.ndarray:
+        """Jacobian only; free if value() was just called at the same x"""
+        return self._compute(np.asarray(x, dtype=float))[1]
+
 
 def estimate_lipschitz_constant(
         surrogate: GP,
         bounds: Optional[np.ndarray] = None,
         num_restarts: Optional[int] = 10,
-        minimize_options: Optional[Dict] = {'maxiter': 200}) -> float:
+        minimize_options: Optional[Dict] = {'maxiter': 200, 'maxcor': 10,
+                                            'ftol': 1e-9},
+        method: Optional[str] = 'restarts',
+        n_jobs: Optional[int] = 1) -> float:
     """
     Estimates the Lipschitz constant of the surrogate
 
+    The bounded branch uses L-BFGS-B, which handles the box constraints
+    natively and accepts the analytic Jacobian.
+
+    method selects the bounded global optimiser: 'restarts' (random
+    multistart, the default) or 'shgo' (simplicial homology, opt-in;
+    often fewer dmu_dx calls, but n shgo sampling points are a smaller
+    search budget than n full multistart restarts, so its L estimates
+    can come out lower on the same num_restarts).
+
+    The multistart local optimisations are independent, so setting
+    n_jobs != 1 runs them in parallel (see minimize_with_restarts).
+    Note that the surrogate is pickled once per restart in that case,
+    so the speedup is not free for models with large training sets.
+
     Returns
     -------
     float
         Lipschitz constant estimate
     """
-
-    def negative_df(x: np.ndarray) -> np.ndarray:
-        model = surrogate
-        x = np.atleast_2d(x)
-        dmdx = model.dmu_dx(x).sum(-1)
-        # simply take the norm of the expectation of the gradient
-        res = np.sqrt((dmdx * dmdx).sum(1))
-        return -res
+    # Use the analytic Jacobian where the closed-form Hessian is available
+    use_jac = isinstance(surrogate.kern, GPy.kern.RBF)
+    negative_df = _NegativeGradNorm(surrogate, use_jac=use_jac)
+    jac = True if use_jac else None
 
     if bounds is None:
         # TODO: test this
         # No bounds, no restarts, so start at highest grad in surrogate data
         idx_biggest_grad = np.argmax(surrogate.dmu_dx(surrogate.X).sum(-1))
-        opt_result = spo.minimize(negative_df, surrogate.X[idx_biggest_grad])
+        opt_result = spo.minimize(negative_df, surrogate.X[idx_biggest_grad],
+                                  jac=jac)
+    elif method == 'shgo':
+        minimizer_kwargs = {'method': 'L-BFGS-B',
+                            'options': minimize_options}
+        if use_jac:
+            minimizer_kwargs['jac'] = negative_df.grad
+        # Sobol sampling: the default simplicial sampling misses the
+        # global optimum too often at these small n
+        opt_result = spo.shgo(negative_df.value,
+                              bounds=list(zip(bounds[:, 0], bounds[:, 1])),
+                              n=num_restarts,
+                              sampling_method='sobol',
+                              minimizer_kwargs=minimizer_kwargs)
     else:
         opt_result = minimize_with_restarts(negative_df, bounds,
                                             num_restarts=num_restarts,
                                             hard_bounds=bounds,
-                                            minimize_options=minimize_options)
-    best_negative_df = opt_result.fun.item()
+                                            jac=jac,
+                                            minimize_options=minimize_options,
+                                            method='L-BFGS-B',
+                                            sampler='lhs',
+                                            n_jobs=n_jobs)
+    best_negative_df = float(opt_result.fun)
     L = -best_negative_df
 
     # to avoid problems in cases in which the model is flat.
@@ -60,13 +202,14 @@ def estimate_lipschitz_around_x(x: np.ndarray, surrogate, bounds) -> float:
     -------
     L
     """
-    # Search spaces for the local Lipschitz constant optimization
+    # Search spaces for the local Lipschitz constant optimization.
+    # Filled column-by-column into one preallocated (D, 2) array instead
+    # of reshaping and hstacking intermediates; this runs on every BO
+    # iteration
+    lipschitz_search_space = np.empty((x.shape[0], 2))
     theta = surrogate.kern.lengthscale
-    lower_sp = np.maximum(bounds[:, 0], x - theta)
-    upper_sp = np.minimum(bounds[:, 1], x + theta)
-    lower_sp = lower_sp.reshape(-1, 1)
-    upper_sp = upper_sp.reshape(-1, 1)
-    lipschitz_search_space = np.hstack((lower_sp, upper_sp))
+    np.maximum(bounds[:, 0], x - theta, out=lipschitz_search_space[:, 0])
+    np.minimum(bounds[:, 1], x + theta, out=lipschitz_search_space[:, 1])
     L = estimate_lipschitz_constant(surrogate,
                                     lipschitz_search_space)
     return L
\ No newline at end of file
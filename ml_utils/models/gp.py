@@ -308,6 +308,37 @@ class GP(object):
 
         self.set_data(X=X, Y=Y, update=update)
 
+    def set_data_shared(self, X: np.ndarray, Y: np.ndarray) -> None:
+        """Like set_data(), but stores the given arrays by reference.
+
+        Used by ModelCollection, whose local models all share identical
+        training data: copying it through set_data() would cost one
+        copy (and a posterior-cache invalidation pass) per model. The
+        caller must not mutate the arrays afterwards; passing read-only
+        views makes that explicit.
+
+        Parameters
+        ----------
+        X
+            new X data (not copied)
+
+        Y
+            new (raw) Y data (not copied)
+        """
+        assert len(X) == len(Y)
+        self.X, self.Y_raw = X, Y
+
+        self.y_mean = np.mean(Y)
+        if self.remove_y_mean:
+            self.Y = self.Y_raw - self.y_mean
+        else:
+            self.Y = self.Y_raw
+
+        self.output_dim = Y.shape[1]
+
+        if self.auto_update:
+            self.update()
+
     def update(self) -> None:
         """Update things
 
@@ -806,6 +837,40 @@ class GP(object):
 
         return mean_jac, var_jac
 
+    def d2mu_dx2(self, x_star: np.ndarray) -> np.ndarray:
+        """Hessian of the posterior mean evaluated at locations x_star.
+
+        Only implemented for RBF kernels, where it has a closed form:
+        d2k/dx2 = k(x, x_i) * (w w^T - diag(1/l^2)) with w = (x - x_i)/l^2.
+        Summed over output dimensions, like dmu_dx().
+
+        Parameters
+        ----------
+        x_star
+            Points to evaluate the Hessian at
+
+        Returns
+        -------
+        np.ndarray of shape (len(x_star), D, D)
+        """
+        if not isinstance(self.kern, GPy.kern.RBF):
+            raise NotImplementedError(
+                "d2mu_dx2 is only available for RBF kernels")
+
+        inv_l2 = 1. / np.square(self.kern.lengthscale)  # (D,) or (1,)
+
+        # (n, N, D) pairwise differences scaled by the lengthscales
+        w = (x_star[:, None, :] - self.X[None, :, :]) * inv_l2
+
+        # weights of each training point's contribution, summed over outputs
+        c = self.kern.K(x_star, self.X) * self.alpha.sum(-1)[None, :]
+
+        hess = np.einsum('mn,mnd,mne->mde', c, w, w)
+        hess -= c.sum(1)[:, None, None] * \
+                (np.eye(x_star.shape[1]) * inv_l2)[None]
+
+        return hess
+
     # @classmethod
     def plot(self, model=None, n: int = None, eps: float = None,
              cmap: matplotlib.colors.Colormap = 'YlOrRd',
@@ -1,8 +1,61 @@
-import numpy as np
 import copy
+import multiprocessing as mp
+from concurrent import futures
+
+import GPy
+import numpy as np
 from slice_sampling import slice_sample
 
 
+def _run_slice_chain(model, sigma, bounds, burn_in, n_samples, seed=None,
+                     verbose=False):
+    """
+    Runs one slice-sampling chain on the given model and returns an
+    (n_samples, n_hps) array of hp samples.
+
+    Module-level so that it can be pickled and run on process-pool
+    workers. The chain state is the accepted sample of each
+    slice_sample call, which is fed back as the next starting point.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+
+    slice_hps = np.zeros((n_samples, len(model.param_array)))
+
+    # Hoisted out of the loops: building the callable per iteration paid
+    # a lambda allocation and attribute lookups on every call
+    def neg_log_theta(x):
+        return -1 * model.objective_log_theta(x)
+
+    # Taken once up front; the loops previously recomputed
+    # np.log(model.param_array) every iteration even though it only
+    # reflects the point slice_sample last evaluated anyway. Chaining
+    # the accepted samples explicitly is both cheaper and the intended
+    # Markov-chain behaviour
+    log_theta = np.log(model.param_array)
+
+    for ii in range(burn_in):
+        if verbose:
+            print("Burning in... {}/{}...".format(ii, burn_in - 1))
+
+        log_theta = slice_sample(log_theta,
+                                 neg_log_theta,
+                                 sigma=sigma,
+                                 bounds=bounds,
+                                 verbose=verbose)
+    for ii in range(n_samples):
+        if verbose:
+            print("Getting {}-th sample...".format(ii))
+        log_theta = slice_sample(log_theta,
+                                 neg_log_theta,
+                                 sigma=sigma,
+                                 bounds=bounds,
+                                 verbose=verbose)
+        np.exp(log_theta, out=slice_hps[ii, :])
+
+    return slice_hps
+
+
 class ModelCollection(object):
     """
     Wrapper class for sampling-based inference.
@@ -15,13 +68,20 @@ class ModelCollection(object):
     run for each sample before a prediction is returned.
     """
 
-    def __init__(self, model, verbose=False):
+    def __init__(self, model, dtype=np.float64, verbose=False):
         # make sure we have a sampling-based model
         assert hasattr(model, 'opt_params')
         assert model.opt_params['method'] in ['slice']
 
         self.verbose = verbose
 
+        # dtype of the stored hp samples and of the X handed to the
+        # local models. np.float32 halves the memory bandwidth of the
+        # kernel-matrix assembly in predict at a negligible predictive
+        # cost; Y stays float64 for the numerical safety of the
+        # Cholesky factorisations
+        self.dtype = np.dtype(dtype)
+
         self.opt_params = model.opt_params
 
         # How many samples to discard before keeping slice samples
@@ -38,10 +98,34 @@ class ModelCollection(object):
         # self.samples = self.original_model.opt_params['slice_hps']
         self.samples = None
 
-        # create the models for the hp samples
+        # create the models for the hp samples. These are shallow clones
+        # of the one deepcopied template: each gets its own kernel (and
+        # opt_params dict) so the hps can be set independently, but X and
+        # Y are shared by reference instead of being copied S times
         self.model_list = []
         for ii in range(self.opt_params['n_samples']):
-            self.model_list.append(copy.deepcopy(model))
+            self.model_list.append(self._clone_model(self.original_model))
+
+        # Hand the clones their reduced-precision shared X right away;
+        # otherwise the dtype would only apply after the first set_XY
+        if self.dtype != np.float64:
+            self.update_local_models_data()
+
+    @staticmethod
+    def _clone_model(template):
+        """
+        Cheap clone of template sharing its (read-only) training data.
+
+        Only the parts that are mutated per sample are copied: the
+        kernel, whose hps differ between the local models, and the
+        opt_params dict. The posterior caches (Ka, alpha, ...) are
+        rebuilt wholesale by update() when the hps are set, so sharing
+        the current ones is safe.
+        """
+        m = copy.copy(template)
+        m.kern = template.kern.copy()
+        m.opt_params = dict(template.opt_params)
+        return m
 
     @property
     def param_array(self):
@@ -57,30 +141,35 @@ class ModelCollection(object):
         """
         Setting param_array updates the hps in all the local models
         """
+        if p is not None:
+            p = np.asarray(p, dtype=self.dtype)
         self.samples = p
         self.opt_params['slice_hps'] = p
         self.update_local_models_hps()
 
     def __getattr__(self, name):
         """
-        This redirects any methods that are not explicitly set
+        This redirects any attributes that are not explicitly set
         to self.original_model.
 
         This function is only called if the called attribute
         doesn't already exist.
 
-        If original_model.name is a method, then it will be run.
-        Otherwise the element will just be accessed.
+        Methods are returned bound to original_model, so the caller
+        supplies the arguments directly. Bound methods are stable, so
+        they are cached on the instance and subsequent lookups skip
+        __getattr__ entirely; data attributes (X, Y, ...) are looked up
+        fresh each time as they may change.
         """
+        if name.startswith('__'):
+            # don't forward dunder lookups (e.g. during copy/pickle)
+            raise AttributeError(name)
         if self.verbose:
-            print("Calling function '{}' of embedded model".format(name))
-        if callable(getattr(self.original_model, name)):
-            try:
-                return getattr(self.original_model, name)(*args, **kwargs)
-            except NameError:  # no args provided
-                return getattr(self.original_model, name)()
-        else:
-            return getattr(self.original_model, name)
+            print("Redirecting '{}' to embedded model".format(name))
+        attr = getattr(self.original_model, name)
+        if callable(attr):
+            self.__dict__[name] = attr
+        return attr
 
     def plot(self, *args, **kwargs):
         # Use the plotting function in basic_gp but provide the current class
@@ -91,6 +180,10 @@ class ModelCollection(object):
     def optimize(self, *args, verbose=False, **kwargs):
         """
         Run original_model.optimize() and then update model_list
+
+        If opt_params['n_chains'] > 1, that many independent
+        slice-sampling chains are run in parallel on a process pool,
+        each with its own burn-in and a share of n_samples.
         """
         # Sample the hps here and store them
         starting_hps = self.original_model.param_array
@@ -106,30 +199,36 @@ class ModelCollection(object):
         else:
             sigma = 1.0  # the function's default value
 
-        slice_hps = np.zeros((n_samples, len(self.original_model.param_array)))
-
-        for ii in range(self.burn_in):
-            if verbose:
-                print("Burning in... {}/{}...".format(ii, self.burn_in - 1))
-
-            slice_sample(np.log(self.original_model.param_array),
-                         lambda x: -1 *
-                         self.original_model.objective_log_theta(x),
-                         sigma=sigma,
-                         bounds=bounds,
-                         verbose=verbose)
-        for ii in range(n_samples):
-            if verbose:
-                print("Getting {}-th sample...".format(ii))
-            slice_hps[ii, :] = np.exp(
-                slice_sample(np.log(self.original_model.param_array),
-                             lambda x: -1 *
-                             self.original_model.objective_log_theta(x),
-                             sigma=sigma,
-                             bounds=bounds,
-                             verbose=verbose)
-            )
-            # self.param_array = starting_hps
+        if 'n_chains' in self.opt_params.keys():
+            n_chains = self.opt_params['n_chains']
+        else:
+            n_chains = 1
+
+        if n_chains == 1:
+            slice_hps = _run_slice_chain(self.original_model, sigma, bounds,
+                                         self.burn_in, n_samples,
+                                         verbose=verbose)
+        else:
+            # Independent chains with different seeds. Each worker gets
+            # its own copy of the model (via pickling), burns in and
+            # returns its share of the samples
+            samples_per_chain = [n_samples // n_chains] * n_chains
+            for ii in range(n_samples % n_chains):
+                samples_per_chain[ii] += 1
+            seeds = np.random.randint(2 ** 31 - 1, size=n_chains)
+
+            try:
+                ctx = mp.get_context('fork')
+            except ValueError:  # fork not available on this platform
+                ctx = None
+
+            with futures.ProcessPoolExecutor(max_workers=n_chains,
+                                             mp_context=ctx) as executor:
+                jobs = [executor.submit(_run_slice_chain,
+                                        self.original_model, sigma, bounds,
+                                        self.burn_in, n, seed, verbose)
+                        for n, seed in zip(samples_per_chain, seeds)]
+                slice_hps = np.concatenate([job.result() for job in jobs])
 
         # Set the hps back to the starting ones instead of the last sample
         # of the slice sampling procedure -- why?
@@ -149,11 +248,21 @@ class ModelCollection(object):
     def update_local_models_data(self):
         """
         Sets the X and Y variables in model list
+
+        All local models see identical data, so they are handed one
+        pair of read-only views via set_data_shared() instead of each
+        copying the arrays through set_XY()
         """
+        if self.dtype == np.float64:
+            X = self.original_model.X.view()
+        else:
+            # reduced-precision copy for the kernel-matrix assembly
+            X = self.original_model.X.astype(self.dtype)
+        Y = self.original_model.Y + self.original_model.y_mean
+        X.setflags(write=False)
+        Y.setflags(write=False)
         for ii in range(len(self.model_list)):
-            self.model_list[ii].set_XY(X=self.original_model.X,
-                                       Y=(self.original_model.Y +
-                                          self.original_model.y_mean))
+            self.model_list[ii].set_data_shared(X, Y)
 
     def set_XY(self, *args, **kwargs):
         """
@@ -170,19 +279,101 @@ class ModelCollection(object):
         self.original_model.set_data(*args, **kwargs)
         self.update_local_models_data()
 
+    def _batch_predict_possible(self):
+        """
+        Whether predict_batch() can be used instead of the per-model loop.
+
+        The batched path assembles the kernel matrices directly from the
+        hp samples, so it only supports the plain (stationary) RBF kernel
+        with all hps free.
+        """
+        orig = self.original_model
+        return (self.samples is not None
+                and type(orig.kern) is GPy.kern.RBF
+                and not orig.kernel_params_fixed
+                and not orig.lik_variance_fixed)
+
+    def predict_batch(self, x_star):
+        """
+        Vectorized prediction across all hp samples at once.
+
+        All local models share X and Y and differ only in their
+        hyperparameters, so the S kernel matrices are stacked into one
+        (S, N, N) tensor and solved in a single batched BLAS call
+        instead of S Python-level predict() calls.
+
+        Returns the posterior mean and variance averaged over samples.
+        """
+        orig = self.original_model
+        samples = np.asarray(self.samples)
+
+        # param_array layout of the GP class: [kern variance,
+        # lengthscale(s), lik_variance]
+        kern_var = samples[:, 0]
+        lik_var = samples[:, -1]
+        inv_l2 = 1. / np.square(samples[:, 1:-1])
+        # broadcast a single lengthscale across all input dimensions
+        inv_l2 = np.broadcast_to(inv_l2, (len(samples), orig.X.shape[1]))
+
+        # The kernel tensors are assembled in the collection's dtype --
+        # this is the memory-bandwidth-bound phase that a float32
+        # ModelCollection is meant to speed up. The solves below still
+        # run in float64 because Y is kept in float64
+        X = orig.X.astype(self.dtype, copy=False)
+        x_star = x_star.astype(self.dtype, copy=False)
+
+        # Shared squared-distance tensors, scaled per sample
+        d2_train = np.square(X[:, None, :] - X[None, :, :])
+        d2_star = np.square(x_star[:, None, :] - X[None, :, :])
+        r2_train = np.einsum('nmd,sd->snm', d2_train, inv_l2)
+        r2_star = np.einsum('mnd,sd->smn', d2_star, inv_l2)
+
+        eye = np.eye(len(X), dtype=self.dtype)
+        K = kern_var[:, None, None] * np.exp(-0.5 * r2_train) \
+            + lik_var[:, None, None] * eye
+        k_star = kern_var[:, None, None] * np.exp(-0.5 * r2_star)
+
+        try:
+            alpha = np.linalg.solve(K, orig.Y[None])
+            v = np.linalg.solve(K, np.swapaxes(k_star, 1, 2))
+        except np.linalg.LinAlgError:
+            # same stabilisation as GP.update()
+            if not orig.stabilise_mat_inv:
+                raise
+            K = K + 1e-8 * eye
+            alpha = np.linalg.solve(K, orig.Y[None])
+            v = np.linalg.solve(K, np.swapaxes(k_star, 1, 2))
+
+        # (S, M, 1) means and (S, M) diagonal variances with obs noise
+        mu = np.einsum('smn,snk->smk', k_star, alpha)
+        var = kern_var[:, None] - np.einsum('smn,snm->sm', k_star, v) \
+            + lik_var[:, None]
+
+        mu = mu.mean(0)
+        if orig.remove_y_mean:
+            mu = mu + orig.y_mean
+        var = var.mean(0).reshape(mu.shape)
+
+        return mu, var
+
     def predict(self, x_star, y_star=None, full_cov=False):
         # Predict using each sampled hp and return the mean posterior
-        mu = np.zeros((len(x_star), 1))
-        var = np.zeros((len(x_star), 1))
-
-        # no need to hold on to each sample's values, so just adding
-        # them all together and then dividing by n after the loop
-        for ii in range(self.n_samples):
-            m, v = self.model_list[ii].predict(x_star, full_cov=full_cov)
-            mu += m
-            var += v
-        mu = mu / len(self.samples)
-        var = var / len(self.samples)
+        if not full_cov and self._batch_predict_possible():
+            mu, var = self.predict_batch(x_star)
+        else:
+            # no need to hold on to each sample's values, so accumulate
+            # them all in-place and then divide by n after the loop. The
+            # first prediction doubles as the accumulation buffer, which
+            # also gets the shapes right when full_cov=True
+            mu, var = self.model_list[0].predict(x_star, full_cov=full_cov)
+            for ii in range(1, self.n_samples):
+                m, v = self.model_list[ii].predict(x_star, full_cov=full_cov)
+                np.add(mu, m, out=mu)
+                np.add(var, v, out=var)
+            # divide by n_samples, not len(self.samples), which may not
+            # be set yet
+            mu /= self.n_samples
+            var /= self.n_samples
 
         if y_star is not None:
             if full_cov:
@@ -1,4 +1,7 @@
 """Optimization utilities"""
+import multiprocessing as mp
+import os
+from concurrent import futures
 from typing import Callable, Optional, Dict
 
 import numpy as np
@@ -6,13 +9,130 @@ import scipy as sp
 from scipy import optimize
 
 
+def _random_start(restart_bounds):
+    """Draws a uniformly random starting location within the bounds"""
+    return (restart_bounds[:, 1] - restart_bounds[:, 0]) \
+           * np.random.random_sample((restart_bounds.shape[0],)) \
+           + restart_bounds[:, 0]
+
+
+def _generate_starts(restart_bounds, num_starts, sampler):
+    """Generates a list of starting locations within the bounds.
+
+    sampler = 'lhs' or 'sobol' uses the scipy.stats.qmc space-filling
+    designs, which cover the box more evenly than iid uniform draws, so
+    the same restart budget locates the global optimum more often.
+    'uniform' keeps independent random draws.
+    """
+    if sampler == 'uniform':
+        return [_random_start(restart_bounds) for _ in range(num_starts)]
+
+    from scipy.stats import qmc  # local import: requires scipy >= 1.7
+
+    if sampler == 'lhs':
+        engine = qmc.LatinHypercube(d=restart_bounds.shape[0])
+    elif sampler == 'sobol':
+        engine = qmc.Sobol(d=restart_bounds.shape[0])
+    else:
+        raise ValueError("Unknown start sampler: {}".format(sampler))
+
+    starts = qmc.scale(engine.random(num_starts),
+                       restart_bounds[:, 0],
+                       restart_bounds[:, 1])
+    return list(starts)
+
+
+def _minimize_from_start(optimiser_func, x0, jac, hard_bounds,
+                         minimize_options, method=None):
+    """Runs a single local minimization from x0.
+
+    Module-level (rather than a closure) so that it can be pickled and
+    submitted to process-pool workers. Returns None if the optimisation
+    crashed with a LinAlgError.
+    """
+    try:
+        return optimize.minimize(optimiser_func,
+                                 x0,
+                                 method=method,
+                                 jac=jac,
+                                 bounds=hard_bounds,
+                                 options=minimize_options)
+    except (np.linalg.LinAlgError, sp.linalg.LinAlgError):
+        return None
+
+
+def _minimize_with_restarts_parallel(optimiser_func, restart_bounds,
+                                     num_restarts, hard_bounds, jac,
+                                     minimize_options, method, sampler,
+                                     n_jobs, verbose):
+    """Parallel version of the multistart loop.
+
+    Each restart is independent, so the local optimisations are submitted
+    to a pool of worker processes and reduced to the best result. Note
+    that optimiser_func (and the surrogate it captures) is pickled once
+    per submitted restart on every platform -- the executor serializes
+    the arguments of each job even with the fork start method, which
+    only avoids re-importing module state in the children. Parallel
+    restarts therefore pay a per-restart serialization cost.
+    """
+    x0s = _generate_starts(restart_bounds, num_restarts, sampler)
+
+    try:
+        ctx = mp.get_context('fork')
+    except ValueError:  # fork not available on this platform
+        ctx = None
+
+    if verbose:
+        print(f"Running {num_restarts} restarts on {n_jobs} processes")
+
+    with futures.ProcessPoolExecutor(max_workers=n_jobs,
+                                     mp_context=ctx) as executor:
+        jobs = [executor.submit(_minimize_from_start, optimiser_func, x0,
+                                jac, hard_bounds, minimize_options, method)
+                for x0 in x0s]
+        results = [job.result() for job in jobs]
+
+    ncrashes = sum(1 for r in results if r is None)
+    results = [r for r in results if r is not None and r.status != 1]
+
+    if ncrashes == num_restarts:  # if all optimizations failed
+        print("All multi-started optimizations encountered LinAlgErrors!")
+    if not results:
+        return None
+
+    best_opt_result = min(results, key=lambda r: r.fun)
+    if verbose:
+        print("Completed parallel multigrad with", num_restarts,
+              "restarts and total nfev =", sum(r.nfev for r in results))
+    return best_opt_result
+
+
 def minimize_with_restarts(optimiser_func, restart_bounds, num_restarts=5,
                            min_successes=3, max_tries=None, hard_bounds=None,
-                           jac=None, minimize_options=None, verbose=False):
+                           jac=None, minimize_options=None, method=None,
+                           sampler='uniform', n_jobs=1, verbose=False):
     """
     Runs scipy.optimize.minimize() with random restarts
 
+    sampler chooses how the starting locations are generated: 'uniform'
+    (iid random, the default), or the 'lhs' / 'sobol' space-filling
+    designs (see _generate_starts).
+
+    If n_jobs != 1, the restarts are run in parallel on a process pool
+    (n_jobs = None or -1 uses one worker per core, overridable with the
+    BO_NUM_PARALLEL_STARTS environment variable). The optimiser_func (and
+    anything it captures, e.g. a GP surrogate) must then be picklable.
     """
+    if n_jobs in (None, -1):
+        n_jobs = int(os.environ.get('BO_NUM_PARALLEL_STARTS',
+                                    os.cpu_count()))
+    if n_jobs != 1:
+        if type(restart_bounds) is list:
+            restart_bounds = np.array(restart_bounds)
+        return _minimize_with_restarts_parallel(
+            optimiser_func, restart_bounds, num_restarts, hard_bounds,
+            jac, minimize_options, method, sampler, n_jobs, verbose)
+
     # Hard upper limit to kill the optimization if we keep on failing
     if max_tries is None:
         max_tries = (num_restarts + min_successes) * 3
@@ -23,18 +143,26 @@ def minimize_with_restarts(optimiser_func, restart_bounds, num_restarts=5,
         def minimizer(x):
             return optimize.minimize(optimiser_func,
                                      x,
+                                     method=method,
                                      bounds=hard_bounds,
                                      options=minimize_options)
     else:
         def minimizer(x):
             return optimize.minimize(optimiser_func,
                                      x,
+                                     method=method,
                                      jac=jac,
                                      bounds=hard_bounds,
                                      options=minimize_options)
 
     if type(restart_bounds) is list:
         restart_bounds = np.array(restart_bounds)
+
+    # The whole set of starts is generated up front so that the QMC
+    # samplers can spread them evenly; extra tries after crashes fall
+    # back to uniform draws
+    starts = _generate_starts(restart_bounds, num_restarts, sampler)
+
     best_eval = None
     best_opt_result = None
     nfev = 0
@@ -43,9 +171,8 @@ def minimize_with_restarts(optimiser_func, restart_bounds, num_restarts=5,
     continue_trying = True
     # for ii in range(num_restarts):
     while continue_trying:
-        x0 = (restart_bounds[:, 1] - restart_bounds[:, 0]) \
-             * np.random.random_sample((restart_bounds.shape[0],)) \
-             + restart_bounds[:, 0]
+        x0 = starts[n_runs] if n_runs < len(starts) \
+            else _random_start(restart_bounds)
 
         if verbose:
             print("multistart iteration", n_runs, 'out of', num_restarts)
@@ -61,18 +188,14 @@ def minimize_with_restarts(optimiser_func, restart_bounds, num_restarts=5,
                 if verbose:
                     print("optimisation failed!")
             else:
-                curr_x = opt_result.x
-                if best_opt_result is None:
+                # Compare via opt_result.fun instead of re-evaluating
+                # optimiser_func, which may return a (fun, jac) tuple
+                if best_eval is None or opt_result.fun < best_eval:
                     best_opt_result = opt_result
-                    best_eval = (curr_x, optimiser_func(curr_x))
+                    best_eval = opt_result.fun
                     if verbose:
-                        print("Updating best to", best_eval)
-                else:
-                    if optimiser_func(curr_x) < best_eval[1]:
-                        best_opt_result = opt_result
-                        best_eval = (curr_x, optimiser_func(curr_x))
-                        if verbose:
-                            print("Updating best to", best_eval)
+                        print("Updating best to",
+                              (opt_result.x, opt_result.fun))
         except (np.linalg.LinAlgError, sp.linalg.LinAlgError):
             if verbose:
                 print("multistart iteration {} failed".format(n_runs))